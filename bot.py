@@ -1,7 +1,11 @@
 import asyncio
 import logging
-from aiogram import Bot, Dispatcher, types, F
-from aiogram.filters import Command
+import json
+import time
+from dataclasses import dataclass, field
+from aiogram import Bot, Dispatcher, BaseMiddleware, types, F
+from aiogram.dispatcher.flags import get_flag
+from aiogram.filters import Command, CommandObject
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
@@ -18,20 +22,189 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Токен бота из переменных окружения
-BOT_TOKEN = os.getenv("BOT_TOKEN")
+# Файл с описанием подразделений (тенантов). Если не задан - работаем
+# в режиме одного подразделения с токеном из BOT_TOKEN
+TENANTS_FILE = os.getenv("TENANTS_FILE")
 
-if not BOT_TOKEN:
-    logger.error("❌ Токен не найден! Установите переменную BOT_TOKEN")
-    exit(1)
-
-bot = Bot(token=BOT_TOKEN)
 dp = Dispatcher()
 
 DB_NAME = "modular_stations_complaints.db"
 
-def init_db():
-    conn = sqlite3.connect(DB_NAME)
+# Справочник сотрудников по умолчанию
+DEFAULT_ENGINEERS = ["Петров А.И.", "Сидоров В.К.", "Козлова М.П.", "Николаев С.Д."]
+DEFAULT_MSO_MANAGERS = ["Волков Д.А.", "Орлова Е.В.", "Громов М.П.", "Зайцева Т.Н."]
+DEFAULT_MSO_SPECIALISTS = ["Белов С.К.", "Морозова А.П.", "Кузнецов Р.В.", "Павлова И.С."]
+
+# Сколько апдейтов одного подразделения обрабатывается одновременно
+DEFAULT_MAX_CONCURRENT_UPDATES = 5
+
+# Как часто (в секундах) писать в лог нагрузку подразделений
+STATS_LOG_INTERVAL = 300
+
+# Роли и права. Права обработчика задаются флагом permission
+ROLE_TITLES = {
+    "engineer": "Инженер",
+    "mso_manager": "Руководитель МСО",
+    "admin": "Администратор",
+    "read_only": "Только просмотр",
+}
+ROLE_PERMISSIONS = {
+    "engineer": {"create_complaint", "view_complaints", "view_statistics"},
+    "mso_manager": {"create_complaint", "view_complaints", "view_statistics"},
+    "admin": {"create_complaint", "view_complaints", "view_statistics", "manage_users"},
+    "read_only": {"view_complaints", "view_statistics"},
+}
+
+# Сколько секунд роль пользователя хранится в кэше без обращения к БД
+ROLE_CACHE_TTL = 60
+# Максимальное число записей в кэше ролей одного подразделения
+ROLE_CACHE_MAX_SIZE = 1000
+
+@dataclass
+class Tenant:
+    """Подразделение: свой бот, своя БД и свой справочник сотрудников"""
+    name: str
+    token: str
+    db_name: str
+    engineers: list = field(default_factory=lambda: list(DEFAULT_ENGINEERS))
+    mso_managers: list = field(default_factory=lambda: list(DEFAULT_MSO_MANAGERS))
+    mso_specialists: list = field(default_factory=lambda: list(DEFAULT_MSO_SPECIALISTS))
+    max_concurrent_updates: int = DEFAULT_MAX_CONCURRENT_UPDATES
+    admins: list = field(default_factory=list)
+    updates_handled: int = 0
+    updates_waiting: int = 0
+    busy_seconds: float = 0.0
+
+    def __post_init__(self):
+        self.semaphore = asyncio.Semaphore(self.max_concurrent_updates)
+        # telegram_id -> (роль, время истечения)
+        self.role_cache = {}
+
+def load_tenants():
+    """Загрузка подразделений из TENANTS_FILE или из BOT_TOKEN"""
+    if not TENANTS_FILE:
+        bot_token = os.getenv("BOT_TOKEN")
+        if not bot_token:
+            logger.error("❌ Токен не найден! Установите переменную BOT_TOKEN или TENANTS_FILE")
+            exit(1)
+        admins = [int(user_id) for user_id in os.getenv("ADMIN_IDS", "").split(",") if user_id.strip()]
+        return [Tenant(name="default", token=bot_token, db_name=DB_NAME, admins=admins)]
+
+    with open(TENANTS_FILE, encoding="utf-8") as f:
+        config = json.load(f)
+
+    tenants = []
+    for item in config.get("tenants", []):
+        name = item.get("name")
+        if not name:
+            logger.error(f"❌ В файле {TENANTS_FILE} у подразделения не указано поле name")
+            exit(1)
+        # Токен можно указать прямо в файле или через имя переменной окружения
+        token = item.get("token") or os.getenv(item.get("token_env", ""))
+        if not token:
+            logger.error(f"❌ Токен для подразделения {name} не найден")
+            exit(1)
+        max_concurrent_updates = item.get("max_concurrent_updates", DEFAULT_MAX_CONCURRENT_UPDATES)
+        if type(max_concurrent_updates) is not int or max_concurrent_updates < 1:
+            logger.error(f"❌ max_concurrent_updates для подразделения {name} должно быть целым числом не меньше 1")
+            exit(1)
+        staff = item.get("staff", {})
+        tenants.append(Tenant(
+            name=name,
+            token=token,
+            db_name=item.get("db_name", f"{name}_complaints.db"),
+            engineers=staff.get("engineers", list(DEFAULT_ENGINEERS)),
+            mso_managers=staff.get("mso_managers", list(DEFAULT_MSO_MANAGERS)),
+            mso_specialists=staff.get("mso_specialists", list(DEFAULT_MSO_SPECIALISTS)),
+            max_concurrent_updates=max_concurrent_updates,
+            admins=item.get("admins", []),
+        ))
+
+    if not tenants:
+        logger.error(f"❌ В файле {TENANTS_FILE} не описано ни одного подразделения")
+        exit(1)
+
+    for attr in ("token", "db_name"):
+        values = [getattr(tenant, attr) for tenant in tenants]
+        if len(values) != len(set(values)):
+            logger.error(f"❌ Значение {attr} должно быть уникальным для каждого подразделения")
+            exit(1)
+
+    return tenants
+
+class TenantMiddleware(BaseMiddleware):
+    """Определяет подразделение по боту и ограничивает его нагрузку"""
+
+    def __init__(self, tenants_by_bot_id):
+        self.tenants_by_bot_id = tenants_by_bot_id
+
+    async def __call__(self, handler, event, data):
+        tenant = self.tenants_by_bot_id[data["bot"].id]
+        data["tenant"] = tenant
+
+        # Каждое подразделение ждет только свои слоты, поэтому
+        # загруженное подразделение не задерживает остальных
+        tenant.updates_waiting += 1
+        async with tenant.semaphore:
+            tenant.updates_waiting -= 1
+            started = time.monotonic()
+            try:
+                return await handler(event, data)
+            finally:
+                tenant.updates_handled += 1
+                tenant.busy_seconds += time.monotonic() - started
+
+def get_user_role(tenant, user_id):
+    """Роль пользователя с кэшированием, чтобы не ходить в БД на каждый апдейт"""
+    now = time.monotonic()
+    cached = tenant.role_cache.get(user_id)
+    if cached:
+        if cached[1] > now:
+            return cached[0]
+        del tenant.role_cache[user_id]
+
+    conn = sqlite3.connect(tenant.db_name)
+    cursor = conn.cursor()
+    cursor.execute("SELECT role FROM users WHERE telegram_id = ?", (user_id,))
+    row = cursor.fetchone()
+    conn.close()
+
+    # Незарегистрированные пользователи тоже кэшируются, чтобы не нагружать БД
+    role = row[0] if row else None
+    if len(tenant.role_cache) >= ROLE_CACHE_MAX_SIZE:
+        evict_role_cache(tenant, now)
+    tenant.role_cache[user_id] = (role, now + ROLE_CACHE_TTL)
+    return role
+
+def evict_role_cache(tenant, now):
+    """Удаляет устаревшие записи, а если их мало - самые старые"""
+    # Записи добавляются с одинаковым TTL, поэтому в начале словаря
+    # находятся те, что истекают раньше всех
+    for user_id in list(tenant.role_cache):
+        if len(tenant.role_cache) < ROLE_CACHE_MAX_SIZE and tenant.role_cache[user_id][1] > now:
+            break
+        del tenant.role_cache[user_id]
+
+class PermissionMiddleware(BaseMiddleware):
+    """Проверяет, что у пользователя есть право из флага permission обработчика"""
+
+    async def __call__(self, handler, event, data):
+        permission = get_flag(data, "permission")
+        if permission is None:
+            return await handler(event, data)
+
+        role = get_user_role(data["tenant"], event.from_user.id)
+        if permission not in ROLE_PERMISSIONS.get(role, set()):
+            await event.answer(
+                "⛔ Недостаточно прав для этого действия.\n"
+                f"Ваш Telegram ID: {event.from_user.id} - сообщите его администратору."
+            )
+            return
+
+        return await handler(event, data)
+
+def init_db(db_name, admins):
+    conn = sqlite3.connect(db_name)
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -60,9 +233,51 @@ def init_db():
             response_deadline DATE,
             estimated_cost REAL,
             status TEXT DEFAULT 'new',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            author_id INTEGER
+        )
+    ''')
+
+    # Базы, созданные до появления author_id
+    cursor.execute("PRAGMA table_info(complaints)")
+    if "author_id" not in [column[1] for column in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE complaints ADD COLUMN author_id INTEGER")
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_complaints_author
+        ON complaints (author_id, created_at)
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS roles (
+            name TEXT PRIMARY KEY,
+            title TEXT
+        )
+    ''')
+    cursor.executemany("INSERT OR IGNORE INTO roles (name, title) VALUES (?, ?)", ROLE_TITLES.items())
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            telegram_id INTEGER PRIMARY KEY,
+            full_name TEXT,
+            role TEXT NOT NULL REFERENCES roles (name),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            seeded BOOLEAN DEFAULT 0
         )
     ''')
+
+    cursor.execute("PRAGMA table_info(users)")
+    if "seeded" not in [column[1] for column in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE users ADD COLUMN seeded BOOLEAN DEFAULT 0")
+
+    # Администраторы из конфигурации всегда имеют роль admin, а убранные
+    # из конфигурации теряют доступ
+    placeholders = ", ".join("?" * len(admins))
+    cursor.execute(f"DELETE FROM users WHERE seeded = 1 AND telegram_id NOT IN ({placeholders})", admins)
+    cursor.executemany('''
+        INSERT INTO users (telegram_id, role, seeded) VALUES (?, 'admin', 1)
+        ON CONFLICT (telegram_id) DO UPDATE SET role = 'admin', seeded = 1
+    ''', [(user_id,) for user_id in admins])
     
     conn.commit()
     conn.close()
@@ -93,7 +308,7 @@ def get_main_keyboard():
         keyboard=[
             [KeyboardButton(text="📝 Новая рекламация"), KeyboardButton(text="📊 Все рекламации")],
             [KeyboardButton(text="👨‍💼 Рекламации по МСО"), KeyboardButton(text="📈 Статистика")],
-            [KeyboardButton(text="ℹ️ Помощь")]
+            [KeyboardButton(text="🗂 Мои рекламации"), KeyboardButton(text="ℹ️ Помощь")]
         ],
         resize_keyboard=True
     )
@@ -131,41 +346,32 @@ def get_specialist_status_keyboard():
         resize_keyboard=True
     )
 
-def get_engineers_keyboard():
-    return ReplyKeyboardMarkup(
-        keyboard=[
-            [KeyboardButton(text="Петров А.И."), KeyboardButton(text="Сидоров В.К.")],
-            [KeyboardButton(text="Козлова М.П."), KeyboardButton(text="Николаев С.Д.")],
-            [KeyboardButton(text="Другой сотрудник")]
-        ],
-        resize_keyboard=True
-    )
+def get_staff_keyboard(names, other_text):
+    keyboard = [
+        [KeyboardButton(text=name) for name in names[i:i + 2]]
+        for i in range(0, len(names), 2)
+    ]
+    keyboard.append([KeyboardButton(text=other_text)])
+    return ReplyKeyboardMarkup(keyboard=keyboard, resize_keyboard=True)
 
-def get_mso_managers_keyboard():
-    return ReplyKeyboardMarkup(
-        keyboard=[
-            [KeyboardButton(text="Волков Д.А."), KeyboardButton(text="Орлова Е.В.")],
-            [KeyboardButton(text="Громов М.П."), KeyboardButton(text="Зайцева Т.Н.")],
-            [KeyboardButton(text="Другой руководитель")]
-        ],
-        resize_keyboard=True
-    )
+def get_engineers_keyboard(tenant):
+    return get_staff_keyboard(tenant.engineers, "Другой сотрудник")
 
-def get_mso_specialists_keyboard():
-    return ReplyKeyboardMarkup(
-        keyboard=[
-            [KeyboardButton(text="Белов С.К."), KeyboardButton(text="Морозова А.П.")],
-            [KeyboardButton(text="Кузнецов Р.В."), KeyboardButton(text="Павлова И.С.")],
-            [KeyboardButton(text="Другой специалист")]
-        ],
-        resize_keyboard=True
-    )
+def get_mso_managers_keyboard(tenant):
+    return get_staff_keyboard(tenant.mso_managers, "Другой руководитель")
+
+def get_mso_specialists_keyboard(tenant):
+    return get_staff_keyboard(tenant.mso_specialists, "Другой специалист")
+
+def is_tenant_mso_manager(message: types.Message, tenant: Tenant):
+    return message.text in tenant.mso_managers
 
 # Обработчики команд
 @dp.message(Command("start"))
 async def cmd_start(message: types.Message):
     await message.answer(
         "🏭 Добро пожаловать в систему учета рекламаций модульных станций!\n\n"
+        f"Ваш Telegram ID: {message.from_user.id}\n\n"
         "Выберите действие:",
         reply_markup=get_main_keyboard()
     )
@@ -179,6 +385,11 @@ async def cmd_help(message: types.Message):
 📊 **Все рекламации** - просмотр всех рекламаций
 👨‍💼 **Рекламации по МСО** - фильтр по руководителю МСО
 📈 **Статистика** - статистика по рекламациям
+🗂 **Мои рекламации** - рекламации, созданные вами
+
+**Роли:** инженер, руководитель МСО, администратор, только просмотр.
+Администратор назначает роль командой:
+/role <telegram_id> <engineer|mso_manager|admin|read_only> [ФИО]
 
 **Процесс создания рекламации:**
 1. Номер 1С
@@ -200,8 +411,38 @@ async def cmd_help(message: types.Message):
 """
     await message.answer(help_text)
 
+@dp.message(Command("role"), flags={"permission": "manage_users"})
+async def cmd_role(message: types.Message, command: CommandObject, tenant: Tenant):
+    args = (command.args or "").split(maxsplit=2)
+    if len(args) < 2 or not args[0].isdigit() or args[1] not in ROLE_PERMISSIONS:
+        await message.answer(
+            "Использование: /role <telegram_id> <роль> [ФИО]\n"
+            f"Роли: {', '.join(ROLE_PERMISSIONS)}"
+        )
+        return
+
+    user_id = int(args[0])
+    role = args[1]
+    full_name = args[2] if len(args) > 2 else None
+
+    conn = sqlite3.connect(tenant.db_name)
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO users (telegram_id, full_name, role) VALUES (?, ?, ?)
+        ON CONFLICT (telegram_id) DO UPDATE SET
+            role = excluded.role,
+            seeded = 0,
+            full_name = COALESCE(excluded.full_name, users.full_name)
+    ''', (user_id, full_name, role))
+    conn.commit()
+    conn.close()
+
+    tenant.role_cache.pop(user_id, None)
+    await message.answer(f"✅ Пользователю {user_id} назначена роль «{ROLE_TITLES[role]}»")
+    logger.info(f"Пользователю {user_id} назначена роль {role}")
+
 # Основные обработчики
-@dp.message(F.text == "📝 Новая рекламация")
+@dp.message(F.text == "📝 Новая рекламация", flags={"permission": "create_complaint"})
 async def start_complaint(message: types.Message, state: FSMContext):
     await state.set_state(ComplaintForm.waiting_for_1c_number)
     await message.answer(
@@ -218,8 +459,8 @@ async def go_back(message: types.Message, state: FSMContext):
     await message.answer("Главное меню:", reply_markup=get_main_keyboard())
 
 @dp.message(ComplaintForm.waiting_for_1c_number)
-async def process_1c_number(message: types.Message, state: FSMContext):
-    conn = sqlite3.connect(DB_NAME)
+async def process_1c_number(message: types.Message, state: FSMContext, tenant: Tenant):
+    conn = sqlite3.connect(tenant.db_name)
     cursor = conn.cursor()
     cursor.execute("SELECT id FROM complaints WHERE complaint_1c_number = ?", (message.text,))
     if cursor.fetchone():
@@ -261,17 +502,17 @@ async def process_station_number(message: types.Message, state: FSMContext):
     )
 
 @dp.message(ComplaintForm.waiting_for_station_name)
-async def process_station_name(message: types.Message, state: FSMContext):
+async def process_station_name(message: types.Message, state: FSMContext, tenant: Tenant):
     await state.update_data(station_name=message.text)
     await state.set_state(ComplaintForm.waiting_for_manager)
     await message.answer(
         "🔸 **Шаг 5 из 16**\n"
         "Введите ФИО менеджера проекта:",
-        reply_markup=get_engineers_keyboard()
+        reply_markup=get_engineers_keyboard(tenant)
     )
 
 @dp.message(ComplaintForm.waiting_for_manager)
-async def process_manager(message: types.Message, state: FSMContext):
+async def process_manager(message: types.Message, state: FSMContext, tenant: Tenant):
     if message.text == "⬅️ Назад":
         await state.set_state(ComplaintForm.waiting_for_station_name)
         await message.answer("Введите наименование станции (проектное название):")
@@ -283,7 +524,7 @@ async def process_manager(message: types.Message, state: FSMContext):
         "🔸 **Шаг 6 из 16**\n"
         "Введите ФИО инженера-проектировщика раздела *ТХ*:",
         parse_mode="Markdown",
-        reply_markup=get_engineers_keyboard()
+        reply_markup=get_engineers_keyboard(tenant)
     )
 
 @dp.message(ComplaintForm.waiting_for_engineers)
@@ -327,17 +568,17 @@ async def process_engineers(message: types.Message, state: FSMContext):
         )
 
 @dp.message(ComplaintForm.waiting_for_reason)
-async def process_reason(message: types.Message, state: FSMContext):
+async def process_reason(message: types.Message, state: FSMContext, tenant: Tenant):
     await state.update_data(complaint_reason=message.text)
     await state.set_state(ComplaintForm.waiting_for_responsible)
     await message.answer(
         "🔸 **Шаг 8 из 16**\n"
         "Кто занимается вопросом? (ФИО ответственного исполнителя):",
-        reply_markup=get_engineers_keyboard()
+        reply_markup=get_engineers_keyboard(tenant)
     )
 
 @dp.message(ComplaintForm.waiting_for_responsible)
-async def process_responsible(message: types.Message, state: FSMContext):
+async def process_responsible(message: types.Message, state: FSMContext, tenant: Tenant):
     if message.text == "⬅️ Назад":
         await state.set_state(ComplaintForm.waiting_for_reason)
         await message.answer("Опишите причину рекламации подробно:")
@@ -349,7 +590,7 @@ async def process_responsible(message: types.Message, state: FSMContext):
         "🔸 **Шаг 9 из 16**\n"
         "Введите ответственного руководителя *МСО* по станции:",
         parse_mode="Markdown",
-        reply_markup=get_mso_managers_keyboard()
+        reply_markup=get_mso_managers_keyboard(tenant)
     )
 
 @dp.message(ComplaintForm.waiting_for_mso_manager)
@@ -386,7 +627,7 @@ async def process_shmr(message: types.Message, state: FSMContext):
     )
 
 @dp.message(ComplaintForm.waiting_for_pnr)
-async def process_pnr(message: types.Message, state: FSMContext):
+async def process_pnr(message: types.Message, state: FSMContext, tenant: Tenant):
     if message.text == "⬅️ Назад":
         await state.set_state(ComplaintForm.waiting_for_shmr)
         await message.answer("Работы по ШМР подписаны?")
@@ -399,7 +640,7 @@ async def process_pnr(message: types.Message, state: FSMContext):
         "🔸 **Шаг 12 из 16**\n"
         "Введите ФИО специалиста *МСО*, который выезжал на станцию:",
         parse_mode="Markdown",
-        reply_markup=get_mso_specialists_keyboard()
+        reply_markup=get_mso_specialists_keyboard(tenant)
     )
 
 @dp.message(ComplaintForm.waiting_for_mso_specialist)
@@ -481,19 +722,19 @@ async def process_deadline(message: types.Message, state: FSMContext):
     except ValueError:
         await message.answer("❌ Неверный формат даты. Введите в формате *дд.мм.гггг*:", parse_mode="Markdown")
 
-@dp.message(ComplaintForm.waiting_for_cost)
-async def process_cost(message: types.Message, state: FSMContext):
+@dp.message(ComplaintForm.waiting_for_cost, flags={"permission": "create_complaint"})
+async def process_cost(message: types.Message, state: FSMContext, tenant: Tenant):
     try:
         cost = float(message.text)
         await state.update_data(estimated_cost=cost)
         data = await state.get_data()
-        await save_complaint(data, message, state)
+        await save_complaint(data, message, state, tenant)
     except ValueError:
         await message.answer("❌ Введите числовое значение стоимости:")
 
-async def save_complaint(data, message: types.Message, state: FSMContext):
+async def save_complaint(data, message: types.Message, state: FSMContext, tenant: Tenant):
     """Сохранение рекламации в БД"""
-    conn = sqlite3.connect(DB_NAME)
+    conn = sqlite3.connect(tenant.db_name)
     cursor = conn.cursor()
     
     try:
@@ -504,8 +745,8 @@ async def save_complaint(data, message: types.Message, state: FSMContext):
                 complaint_reason, responsible_person, mso_manager, shmr_signed, pnr_signed,
                 mso_specialist, specialist_on_station, last_visit_date,
                 supplier_letter_sent, customer_letter_sent, response_deadline, 
-                estimated_cost, complaint_date
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                estimated_cost, complaint_date, author_id
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             data['complaint_1c_number'], data['station_type'], data['station_number'],
             data.get('station_name', ''), data['manager_name'], data['tech_engineer'],
@@ -514,7 +755,8 @@ async def save_complaint(data, message: types.Message, state: FSMContext):
             data.get('shmr_signed', 0), data.get('pnr_signed', 0), data['mso_specialist'],
             data.get('specialist_on_station', 0), data.get('last_visit_date'),
             data.get('supplier_letter_sent', 0), data.get('customer_letter_sent', 0),
-            data.get('response_deadline'), data.get('estimated_cost'), date.today()
+            data.get('response_deadline'), data.get('estimated_cost'), date.today(),
+            message.from_user.id
         ))
         
         conn.commit()
@@ -565,9 +807,9 @@ async def save_complaint(data, message: types.Message, state: FSMContext):
         conn.close()
         await state.clear()
 
-@dp.message(F.text == "📊 Все рекламации")
-async def show_all_complaints(message: types.Message):
-    conn = sqlite3.connect(DB_NAME)
+@dp.message(F.text == "📊 Все рекламации", flags={"permission": "view_complaints"})
+async def show_all_complaints(message: types.Message, tenant: Tenant):
+    conn = sqlite3.connect(tenant.db_name)
     cursor = conn.cursor()
     cursor.execute('''
         SELECT complaint_1c_number, station_type, station_name, status, mso_manager, created_at 
@@ -590,13 +832,13 @@ async def show_all_complaints(message: types.Message):
     
     await message.answer(response)
 
-@dp.message(F.text == "👨‍💼 Рекламации по МСО")
-async def show_mso_complaints(message: types.Message):
-    await message.answer("Выберите руководителя МСО:", reply_markup=get_mso_managers_keyboard())
+@dp.message(F.text == "👨‍💼 Рекламации по МСО", flags={"permission": "view_complaints"})
+async def show_mso_complaints(message: types.Message, tenant: Tenant):
+    await message.answer("Выберите руководителя МСО:", reply_markup=get_mso_managers_keyboard(tenant))
 
-@dp.message(F.text.in_(["Волков Д.А.", "Орлова Е.В.", "Громов М.П.", "Зайцева Т.Н."]))
-async def show_complaints_by_mso(message: types.Message):
-    conn = sqlite3.connect(DB_NAME)
+@dp.message(F.text, is_tenant_mso_manager, flags={"permission": "view_complaints"})
+async def show_complaints_by_mso(message: types.Message, tenant: Tenant):
+    conn = sqlite3.connect(tenant.db_name)
     cursor = conn.cursor()
     cursor.execute('''
         SELECT complaint_1c_number, station_type, station_name, status, created_at 
@@ -618,9 +860,33 @@ async def show_complaints_by_mso(message: types.Message):
     
     await message.answer(response)
 
-@dp.message(F.text == "📈 Статистика")
-async def show_statistics(message: types.Message):
-    conn = sqlite3.connect(DB_NAME)
+@dp.message(F.text == "🗂 Мои рекламации", flags={"permission": "view_complaints"})
+async def show_my_complaints(message: types.Message, tenant: Tenant):
+    conn = sqlite3.connect(tenant.db_name)
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT complaint_1c_number, station_type, station_name, status, created_at 
+        FROM complaints WHERE author_id = ? ORDER BY created_at DESC LIMIT 10
+    ''', (message.from_user.id,))
+    complaints = cursor.fetchall()
+    conn.close()
+    
+    if not complaints:
+        await message.answer("📭 Вы еще не создавали рекламаций.")
+        return
+    
+    response = "🗂 **Мои рекламации:**\n\n"
+    for comp in complaints:
+        status_icon = "🟢" if comp[3] == "new" else "🟡" if comp[3] == "in_progress" else "🔴"
+        response += f"{status_icon} **{comp[0]}** - {comp[1]}\n"
+        response += f"   Станция: {comp[2]}\n"
+        response += f"   Дата: {comp[4][:10]}\n\n"
+    
+    await message.answer(response)
+
+@dp.message(F.text == "📈 Статистика", flags={"permission": "view_statistics"})
+async def show_statistics(message: types.Message, tenant: Tenant):
+    conn = sqlite3.connect(tenant.db_name)
     cursor = conn.cursor()
     
     cursor.execute("SELECT COUNT(*) FROM complaints")
@@ -671,10 +937,37 @@ async def show_statistics(message: types.Message):
 async def show_help(message: types.Message):
     await cmd_help(message)
 
+def log_tenant_stats(tenants):
+    for tenant in tenants:
+        logger.info(
+            f"Подразделение {tenant.name}: обработано {tenant.updates_handled} апдейтов, "
+            f"в очереди {tenant.updates_waiting}, время обработки {tenant.busy_seconds:.1f} с"
+        )
+
+async def log_tenant_stats_periodically(tenants):
+    while True:
+        await asyncio.sleep(STATS_LOG_INTERVAL)
+        log_tenant_stats(tenants)
+
 async def main():
-    init_db()
-    logger.info("Бот для учета рекламаций модульных станций запущен")
-    await dp.start_polling(bot)
+    tenants = load_tenants()
+    bots = []
+    tenants_by_bot_id = {}
+    for tenant in tenants:
+        init_db(tenant.db_name, tenant.admins)
+        bot = Bot(token=tenant.token)
+        tenants_by_bot_id[bot.id] = tenant
+        bots.append(bot)
+
+    dp.update.outer_middleware(TenantMiddleware(tenants_by_bot_id))
+    dp.message.middleware(PermissionMiddleware())
+    logger.info(f"Бот для учета рекламаций модульных станций запущен, подразделений: {len(tenants)}")
+    stats_task = asyncio.create_task(log_tenant_stats_periodically(tenants))
+    try:
+        await dp.start_polling(*bots)
+    finally:
+        stats_task.cancel()
+        log_tenant_stats(tenants)
 
 if __name__ == "__main__":
     asyncio.run(main())